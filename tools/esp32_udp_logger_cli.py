@@ -1,17 +1,59 @@
 #!/usr/bin/env python3
 import argparse
+import atexit
+import contextlib
+import ctypes
+import errno
+import functools
+import ipaddress
+import json
+import os
+import select
+import selectors
+import signal
 import socket
 import sys
+import threading
 import time
-from dataclasses import dataclass
-from typing import Dict, List, Optional
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Union
 
 from zeroconf import Zeroconf, ServiceBrowser, ServiceInfo
 
+try:
+    import readline
+except ImportError:  # Windows without pyreadline
+    readline = None
+
 SERVICE_TYPE = "_esp32udplog._udp.local."
 DEFAULT_RX_PORT = 9998
 DEFAULT_TX_PORT = 9999
 
+# Kernel receive buffers. The listener gets enough headroom to absorb log bursts
+# while Python is busy writing; Linux clamps this to net.core.rmem_max.
+LISTEN_RCVBUF = 12_582_912
+REPLY_RCVBUF = 262_144
+
+# Datagrams read per ready socket per wakeup (one recvmmsg(2) call on Linux).
+RECV_BATCH = 64
+MAX_DATAGRAM = 65535
+
+# stdout is flushed once this many lines are pending, or after this long,
+# or as soon as no socket has anything more queued.
+FLUSH_EVERY = 32
+FLUSH_INTERVAL_S = 0.05
+
+# Extra time given to other responders after the wanted device has answered.
+DISCOVERY_GRACE_S = 0.15
+
+# The picker stops listing devices above this count and relies on Tab completion.
+PICK_LIST_MAX = 20
+
+# Devices seen by the last discovery are reused for this long by commands
+# that target a single device by name.
+CACHE_TTL_S = 60.0
+
 @dataclass
 class Device:
     name: str
@@ -20,14 +62,35 @@ class Device:
     port: int
 
 class _Listener:
-    def __init__(self):
+    def __init__(self, target_name: Optional[str] = None):
         self.devices: Dict[str, Device] = {}
+        self.found = threading.Event()
+        self._lock = threading.Lock()
+        self.expect(target_name)
+
+    def expect(self, target_name: Optional[str] = None) -> None:
+        """Re-arm ``found`` for a new lookup, counting devices that already answered."""
+        with self._lock:
+            self.target_name = target_name.lower() if target_name else None
+            self.found.clear()
+            if any(self._wanted(name) for name in self.devices):
+                self.found.set()
+
+    def snapshot(self) -> List[Device]:
+        with self._lock:
+            return list(self.devices.values())
+
+    def _wanted(self, name: str) -> bool:
+        return name.lower() == self.target_name
 
     def add_service(self, zc: Zeroconf, service_type: str, name: str) -> None:
         info = zc.get_service_info(service_type, name, timeout=1500)
         dev = _info_to_device(info, name)
         if dev:
-            self.devices[dev.name] = dev
+            with self._lock:
+                self.devices[dev.name] = dev
+                if self._wanted(dev.name):
+                    self.found.set()
 
     def update_service(self, zc: Zeroconf, service_type: str, name: str) -> None:
         self.add_service(zc, service_type, name)
@@ -41,11 +104,7 @@ def _info_to_device(info: Optional[ServiceInfo], fqdn: str) -> Optional[Device]:
     instance = fqdn.split("._esp32udplog._udp.local.")[0]
     port = int(info.port) if info.port else DEFAULT_RX_PORT
 
-    ip = ""
-    for addr in (info.parsed_addresses() or []):
-        if ":" not in addr:  # prefer IPv4
-            ip = addr
-            break
+    ip = next((a for a in (info.parsed_addresses() or ()) if ":" not in a), "")  # prefer IPv4
 
     host = (info.server or "").rstrip(".")
     if not ip:
@@ -53,86 +112,631 @@ def _info_to_device(info: Optional[ServiceInfo], fqdn: str) -> Optional[Device]:
 
     return Device(name=instance, host=host if host else instance + ".local", ip=ip, port=port)
 
-def discover(timeout_s: float = 2.5) -> List[Device]:
-    zc = Zeroconf()
-    listener = _Listener()
-    browser = ServiceBrowser(zc, SERVICE_TYPE, listener)
-    try:
-        time.sleep(timeout_s)
+_ZC: Optional[Zeroconf] = None
+_LISTENER: Optional[_Listener] = None
+
+def _get_zc() -> Zeroconf:
+    global _ZC
+    if _ZC is None:
+        _ZC = Zeroconf()
+        atexit.register(_ZC.close)
+    return _ZC
+
+def _get_listener() -> _Listener:
+    """Return the process-wide listener, starting a long-lived ServiceBrowser on first use."""
+    global _LISTENER
+    if _LISTENER is None:
+        _LISTENER = _Listener()
+        browser = ServiceBrowser(_get_zc(), SERVICE_TYPE, _LISTENER)
+        atexit.register(browser.cancel)  # runs before _ZC.close (atexit is LIFO)
+    return _LISTENER
+
+def discover(timeout_s: float = 2.5, target: Optional[str] = None) -> List[Device]:
+    """Browse for devices for up to ``timeout_s``.
+
+    Returns early once ``target`` (matched case-insensitively) has answered.
+    Without a target it waits the full timeout, so every responder is listed.
+    """
+    listener = _get_listener()
+    listener.expect(target)
+    if listener.found.wait(timeout=timeout_s):
+        time.sleep(DISCOVERY_GRACE_S)
+    else:
         time.sleep(0.25)
-        devices = list(listener.devices.values())
-        devices.sort(key=lambda d: d.name.lower())
-        return devices
-    finally:
-        browser.cancel()
-        zc.close()
+    devices = listener.snapshot()
+    devices.sort(key=lambda d: d.name.lower())
+    return devices
+
+def _cache_path() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "esp32-udp-logger" / "devices.json"
+
+def load_cached_devices(max_age_s: float = CACHE_TTL_S) -> Optional[List[Device]]:
+    path = _cache_path()
+    try:
+        if time.time() - path.stat().st_mtime > max_age_s:
+            return None
+        return [Device(**d) for d in json.loads(path.read_text(encoding="utf-8"))]
+    except (OSError, ValueError, TypeError):
+        return None
+
+def save_cached_devices(devices: List[Device]) -> None:
+    path = _cache_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps([asdict(d) for d in devices]), encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError:
+        pass  # the cache is only an optimization
+
+def match_device(devices: List[Device], sel: str, by_index: bool = True) -> Optional[Device]:
+    """Resolve a picker entry: a 1-based index, a full name, or an unambiguous name prefix."""
+    if by_index and sel.isdigit():
+        n = int(sel)
+        return devices[n - 1] if 1 <= n <= len(devices) else None
+    sel = sel.lower()
+    if not sel:
+        return None
+    matches = [d for d in devices if d.name.lower().startswith(sel)]
+    exact = [d for d in matches if d.name.lower() == sel]
+    if exact:
+        return exact[0]
+    return matches[0] if len(matches) == 1 else None
+
+def _name_completer(names: List[str]):
+    def complete(text: str, state: int) -> Optional[str]:
+        options = [n for n in names if n.lower().startswith(text.lower())]
+        return options[state] if state < len(options) else None
+    return complete
 
 def pick_device(devices: List[Device]) -> Device:
     if not devices:
         raise SystemExit("No devices found. (mDNS blocked? component not advertising _esp32udplog._udp?)")
-    for i, d in enumerate(devices, start=1):
-        print(f"{i:2d}) {d.name:24s}  ip={d.ip:15s}  rx_port={d.port}")
-    while True:
-        sel = input(f"Select device [1-{len(devices)}]: ").strip()
-        if sel.isdigit():
-            n = int(sel)
-            if 1 <= n <= len(devices):
-                return devices[n - 1]
-        print("Invalid selection.")
-
-def send_udp_cmd(ip: str, port: int, cmd: str, expect_reply: bool = True, reply_timeout_s: float = 1.0) -> str:
-    cmd_bytes = cmd.encode("utf-8", errors="replace")
+    # Indices only make sense while the numbered list is on screen.
+    listed = len(devices) <= PICK_LIST_MAX
+    if listed:
+        for i, d in enumerate(devices, start=1):
+            print(f"{i:2d}) {d.name:24s}  ip={d.ip:15s}  rx_port={d.port}")
+    else:
+        print(f"{len(devices)} devices found. Type a name prefix and press Tab to complete.")
+
+    if readline is not None:
+        old_completer, old_delims = readline.get_completer(), readline.get_completer_delims()
+        readline.set_completer_delims(" \t\n")
+        readline.set_completer(_name_completer([d.name for d in devices]))
+        if "libedit" in (readline.__doc__ or ""):  # macOS ships readline backed by libedit
+            readline.parse_and_bind("bind ^I rl_complete")
+        else:
+            readline.parse_and_bind("tab: complete")
     try:
-        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
-            s.settimeout(reply_timeout_s)
+        prompt = f"Select device [1-{len(devices)} or name]: " if listed else "Select device [name]: "
+        sel = input(prompt).strip()
+    finally:
+        if readline is not None:
+            readline.set_completer(old_completer)
+            readline.set_completer_delims(old_delims)
+
+    d = match_device(devices, sel, by_index=listed)
+    if d is None:
+        hint = "a number or a unique name prefix" if listed else "a unique name prefix"
+        raise SystemExit(f"Invalid selection: {sel!r} (use {hint})")
+    return d
+
+def _set_rcvbuf(s: socket.socket, size: int) -> int:
+    """Request a larger SO_RCVBUF and return what the kernel actually granted."""
+    try:
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, size)
+    except OSError:
+        pass
+    try:
+        return int(s.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF))
+    except (OSError, TypeError, ValueError):
+        return 0
+
+@contextlib.contextmanager
+def open_cmd_socket(ip: str, port: int, reply_timeout_s: float = 1.0) -> Iterator[socket.socket]:
+    """Open a UDP socket connected to a device's command port."""
+    try:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    except OSError as e:
+        raise SystemExit(f"Failed to create UDP socket: {e}") from e
+    with sock as s:
+        s.settimeout(reply_timeout_s)
+        _set_rcvbuf(s, REPLY_RCVBUF)
+        try:
+            s.bind(("", 0))
+        except OSError as e:
+            raise SystemExit(f"Failed to bind local UDP socket: {e}") from e
+        try:
+            # A connected socket caches the route and drops datagrams from other peers.
+            s.connect((ip, port))
+        except OSError as e:
+            raise SystemExit(f"Network error sending command to {ip}:{port}: {e}") from e
+        yield s
+
+def send_udp_cmd(
+    ip: str,
+    port: int,
+    cmd: str,
+    expect_reply: bool = True,
+    reply_timeout_s: float = 1.0,
+    sock: Optional[socket.socket] = None,
+    decode: bool = True,
+) -> Union[str, bytes]:
+    """Send one command and return the reply ("" on timeout).
+
+    Pass ``sock`` (from open_cmd_socket) to reuse a socket across several commands;
+    its own timeout then applies instead of ``reply_timeout_s``, and any late
+    reply still queued from an earlier command is discarded first. With
+    ``decode=False`` the raw reply bytes are returned (b"" on timeout).
+    """
+    if sock is None:
+        with open_cmd_socket(ip, port, reply_timeout_s) as s:
+            return _exchange(s, ip, port, cmd, expect_reply, decode, fresh=True)
+    return _exchange(sock, ip, port, cmd, expect_reply, decode, fresh=False)
+
+def _discard_pending(sock: socket.socket) -> None:
+    """Drop datagrams already queued on ``sock`` (late replies to earlier commands)."""
+    timeout = sock.gettimeout()
+    sock.setblocking(False)
+    try:
+        while True:
             try:
-                s.bind(("", 0))
-            except OSError as e:
-                raise SystemExit(f"Failed to bind local UDP socket: {e}") from e
+                sock.recv(2048)
+            except ConnectionRefusedError:
+                continue  # stale ICMP port-unreachable from an earlier command
+    except BlockingIOError:
+        pass
+    finally:
+        sock.settimeout(timeout)
 
+def _exchange(
+    sock: socket.socket, ip: str, port: int, cmd: str, expect_reply: bool, decode: bool, fresh: bool
+) -> Union[str, bytes]:
+    cmd_bytes = cmd.encode("utf-8", errors="replace")
+    empty = "" if decode else b""
+    try:
+        if not fresh:
+            _discard_pending(sock)
+        sock.send(cmd_bytes)
+        if not expect_reply:
+            return empty
+        try:
+            data = sock.recv(2048)
+        except socket.timeout:
+            return empty
+        return data.decode("utf-8", errors="replace") if decode else data
+    except ConnectionRefusedError:
+        # The connected socket surfaces ICMP port-unreachable: nothing is listening.
+        return empty
+    except OSError as e:
+        raise SystemExit(f"Network error sending command to {ip}:{port}: {e}") from e
+
+def print_reply(reply: bytes, if_empty: str) -> None:
+    """Print a raw device reply like print() would, without a decode/encode round trip."""
+    if not reply:
+        print(if_empty)
+        return
+    sys.stdout.flush()
+    sys.stdout.buffer.write(reply + b"\n")
+    sys.stdout.buffer.flush()
+
+def _send_all(sock: socket.socket, payloads: List[bytes]) -> None:
+    """Send several datagrams on a connected socket, in one sendmmsg(2) call where available."""
+    libc = _load_libc()
+    if libc is not None and hasattr(libc, "sendmmsg") and len(payloads) > 1:
+        n = len(payloads)
+        bufs = [ctypes.create_string_buffer(p, len(p)) for p in payloads]
+        iov = (_IoVec * n)()
+        msgs = (_MMsgHdr * n)()
+        for i, buf in enumerate(bufs):
+            iov[i].iov_base = ctypes.addressof(buf)
+            iov[i].iov_len = len(payloads[i])
+            msgs[i].msg_hdr.msg_iov = ctypes.pointer(iov[i])
+            msgs[i].msg_hdr.msg_iovlen = 1
+        sent = 0
+        while sent < n:
+            r = libc.sendmmsg(sock.fileno(), ctypes.byref(msgs, sent * ctypes.sizeof(_MMsgHdr)), n - sent, 0)
+            if r < 0:
+                err = ctypes.get_errno()
+                if err == errno.EINTR:
+                    continue
+                if err in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    break  # let send() below wait for buffer space
+                raise OSError(err, os.strerror(err))
+            sent += r
+        payloads = payloads[sent:]
+    for p in payloads:
+        sock.send(p)
+
+def send_udp_cmds(
+    ip: str,
+    port: int,
+    cmds: List[str],
+    reply_timeout_s: float = 1.0,
+    sock: Optional[socket.socket] = None,
+) -> List[str]:
+    """Send several commands back to back and collect one reply per command.
+
+    Replies are returned in arrival order, padded with "" for any that did not
+    arrive within ``reply_timeout_s``. Pairing them with ``cmds`` by position
+    relies on the firmware answering every command, in the order received.
+    On a reused ``sock``, late replies to earlier commands are discarded first.
+    """
+    if sock is None:
+        with open_cmd_socket(ip, port, reply_timeout_s) as s:
+            return _exchange_many(s, ip, port, cmds, reply_timeout_s, fresh=True)
+    return _exchange_many(sock, ip, port, cmds, reply_timeout_s, fresh=False)
+
+def _exchange_many(
+    sock: socket.socket, ip: str, port: int, cmds: List[str], reply_timeout_s: float, fresh: bool
+) -> List[str]:
+    replies: List[str] = []
+    try:
+        if not fresh:
+            _discard_pending(sock)
+        _send_all(sock, [c.encode("utf-8", errors="replace") for c in cmds])
+        deadline = time.monotonic() + reply_timeout_s
+        while len(replies) < len(cmds):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            ready, _, _ = select.select([sock], [], [], remaining)
+            if not ready:
+                break
             try:
-                s.sendto(cmd_bytes, (ip, port))
-                if not expect_reply:
-                    return ""
-                try:
-                    data, _ = s.recvfrom(2048)
-                    return data.decode("utf-8", errors="replace")
-                except socket.timeout:
-                    return ""
-            except OSError as e:
-                raise SystemExit(f"Network error sending command to {ip}:{port}: {e}") from e
+                data = sock.recv(2048)
+            except (BlockingIOError, socket.timeout):
+                continue
+            replies.append(data.decode("utf-8", errors="replace"))
+    except ConnectionRefusedError:
+        pass  # ICMP port-unreachable: no (further) replies will come
     except OSError as e:
-        raise SystemExit(f"Failed to create UDP socket: {e}") from e
+        raise SystemExit(f"Network error sending command to {ip}:{port}: {e}") from e
+    return replies + [""] * (len(cmds) - len(replies))
+
+_LOCAL_IP_BY_SUBNET: Dict[str, str] = {}
 
 def get_local_ip_for_target(target_ip: str) -> str:
+    """Return the local address used to reach ``target_ip``, memoized per /24."""
+    try:
+        subnet = str(ipaddress.ip_network(f"{target_ip}/24", strict=False))
+    except ValueError:
+        subnet = target_ip
+    cached = _LOCAL_IP_BY_SUBNET.get(subnet)
+    if cached:
+        return cached
     try:
         with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
             s.connect((target_ip, 9))
-            return s.getsockname()[0]
+            local_ip = s.getsockname()[0]
+            _LOCAL_IP_BY_SUBNET[subnet] = local_ip
+            return local_ip
     except OSError as e:
         raise SystemExit(f"Failed to determine local IP for {target_ip}: {e}") from e
 
-def listen_logs(port: int) -> None:
-    print(f"Listening for UDP logs on 0.0.0.0:{port} (Ctrl+C to stop)")
+class _IoVec(ctypes.Structure):
+    _fields_ = [("iov_base", ctypes.c_void_p), ("iov_len", ctypes.c_size_t)]
+
+class _MsgHdr(ctypes.Structure):
+    _fields_ = [
+        ("msg_name", ctypes.c_void_p),
+        ("msg_namelen", ctypes.c_uint32),
+        ("msg_iov", ctypes.POINTER(_IoVec)),
+        ("msg_iovlen", ctypes.c_size_t),
+        ("msg_control", ctypes.c_void_p),
+        ("msg_controllen", ctypes.c_size_t),
+        ("msg_flags", ctypes.c_int),
+    ]
+
+class _MMsgHdr(ctypes.Structure):
+    _fields_ = [("msg_hdr", _MsgHdr), ("msg_len", ctypes.c_uint)]
+
+@functools.lru_cache(maxsize=None)
+def _load_libc() -> Optional[ctypes.CDLL]:
+    if not sys.platform.startswith("linux"):
+        return None
     try:
-        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        libc = ctypes.CDLL("libc.so.6", use_errno=True)
+    except OSError:
+        return None
+    return libc if hasattr(libc, "recvmmsg") and hasattr(libc, "writev") else None
+
+class _RecvMmsg:
+    """Receives up to ``vlen`` datagrams per syscall via recvmmsg(2) on a non-blocking socket.
+
+    ``relay`` hands the received buffers straight to writev(2), so on Linux log
+    lines reach stdout without ever becoming Python objects.
+    """
+
+    def __init__(self, libc: ctypes.CDLL, fd: int, vlen: int = RECV_BATCH, bufsize: int = MAX_DATAGRAM):
+        self._recvmmsg = libc.recvmmsg
+        self._writev = libc.writev
+        self._writev.restype = ctypes.c_ssize_t
+        self._fd = fd
+        self._vlen = vlen
+        self._buf = ctypes.create_string_buffer(vlen * bufsize)
+        self._bytes = (ctypes.c_ubyte * (vlen * bufsize)).from_buffer(self._buf)
+        self._iov = (_IoVec * vlen)()
+        self._msgs = (_MMsgHdr * vlen)()
+        self._out_iov = (_IoVec * (2 * vlen))()  # each datagram plus an optional "\n"
+        self._newline = ctypes.create_string_buffer(b"\n", 1)
+        base = ctypes.addressof(self._buf)
+        self._offsets = [i * bufsize for i in range(vlen)]
+        self._addrs = [base + off for off in self._offsets]
+        for i in range(vlen):
+            self._iov[i].iov_base = self._addrs[i]
+            self._iov[i].iov_len = bufsize
+            self._msgs[i].msg_hdr.msg_iov = ctypes.pointer(self._iov[i])
+            self._msgs[i].msg_hdr.msg_iovlen = 1
+
+    @classmethod
+    def for_socket(cls, s: socket.socket) -> Optional["_RecvMmsg"]:
+        libc = _load_libc()
+        if libc is None:
+            return None
+        return cls(libc, s.fileno())
+
+    def _receive(self) -> int:
+        n = self._recvmmsg(self._fd, self._msgs, self._vlen, 0, None)
+        if n < 0:
+            err = ctypes.get_errno()
+            if err in (errno.EINTR, errno.EAGAIN, errno.EWOULDBLOCK):
+                return 0
+            raise OSError(err, os.strerror(err))
+        return n
+
+    def recv(self) -> List[bytes]:
+        n = self._receive()
+        msgs, addrs = self._msgs, self._addrs
+        return [ctypes.string_at(addrs[i], msgs[i].msg_len) for i in range(n)]
+
+    def relay(self, out_fd: int) -> int:
+        """Receive one batch and write it to ``out_fd`` with a single writev(2); returns the datagram count."""
+        n = self._receive()
+        if not n:
+            return 0
+        msgs, addrs, offsets, data, iov = self._msgs, self._addrs, self._offsets, self._bytes, self._out_iov
+        nl_addr = ctypes.addressof(self._newline)
+        k = total = 0
+        for i in range(n):
+            length = msgs[i].msg_len
+            vec = iov[k]
+            vec.iov_base, vec.iov_len = addrs[i], length
+            k += 1
+            total += length
+            if not length or data[offsets[i] + length - 1] != 0x0A:
+                vec = iov[k]
+                vec.iov_base, vec.iov_len = nl_addr, 1
+                k += 1
+                total += 1
+        while True:
+            written = self._writev(out_fd, iov, k)
+            if written >= 0:
+                break
+            err = ctypes.get_errno()
+            if err != errno.EINTR:
+                raise OSError(err, os.strerror(err))
+        if written < total:
+            # Short write (e.g. a full pipe): finish the rest from Python.
+            rest = b"".join([ctypes.string_at(iov[j].iov_base, iov[j].iov_len) for j in range(k)])[written:]
+            while rest:
+                rest = rest[os.write(out_fd, rest):]
+        return n
+
+def _stdout_fd() -> Optional[int]:
+    try:
+        return sys.stdout.fileno()
+    except (AttributeError, OSError, ValueError):
+        return None
+
+def _drain_wakeup(s: socket.socket) -> List[bytes]:
+    with contextlib.suppress(OSError):
+        s.recv(512)
+    return []
+
+def _join_lines(packets: List[bytes]) -> bytes:
+    """Concatenate datagrams into one newline-terminated chunk, without decoding."""
+    parts: List[bytes] = []
+    for data in packets:
+        parts.append(data)
+        if not data.endswith(b"\n"):
+            parts.append(b"\n")
+    return b"".join(parts)
+
+class _RecvFrom:
+    """Portable fallback: one recv_into per datagram until a non-blocking socket runs dry."""
+
+    def __init__(self, s: socket.socket, vlen: int = RECV_BATCH):
+        self._s = s
+        self._vlen = vlen
+        # Received into once per datagram, so only the exact-size copy is allocated.
+        self._buf = bytearray(MAX_DATAGRAM)
+        self._view = memoryview(self._buf)
+
+    def recv(self) -> List[bytes]:
+        recv_into, buf, view = self._s.recv_into, self._buf, self._view
+        packets: List[bytes] = []
+        try:
+            while len(packets) < self._vlen:
+                n = recv_into(buf, MAX_DATAGRAM)
+                packets.append(view[:n].tobytes())
+        except (BlockingIOError, InterruptedError):
+            pass
+        return packets
+
+def _open_log_socket(port: int, reuse_port: bool = False) -> socket.socket:
+    try:
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    except OSError as e:
+        raise SystemExit(f"Failed to create UDP socket for listening: {e}") from e
+    _set_rcvbuf(s, LISTEN_RCVBUF)
+    if reuse_port:
+        # Lets the --workers processes share the port; with SO_REUSEPORT, Linux
+        # spreads unicast datagrams across them. Plain listeners keep exclusive
+        # binds so a second `listen` on the same port fails loudly.
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if hasattr(socket, "SO_REUSEPORT"):
             try:
-                s.bind(("", port))
-            except OSError as e:
-                raise SystemExit(f"Failed to bind UDP listener on port {port}: {e}") from e
+                s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            except OSError:
+                pass
+    try:
+        s.bind(("", port))
+        s.setblocking(False)
+    except OSError as e:
+        s.close()
+        raise SystemExit(f"Failed to bind UDP listener on port {port}: {e}") from e
+    return s
 
+def _warn_if_rcvbuf_clamped() -> None:
+    """Check once, on a throwaway socket, whether the kernel grants LISTEN_RCVBUF."""
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            granted = _set_rcvbuf(s, LISTEN_RCVBUF)
+    except OSError:
+        return  # opening the real listener reports the error
+    if sys.platform.startswith("linux"):
+        granted //= 2  # Linux reports twice the usable size (it adds bookkeeping overhead)
+    if granted < LISTEN_RCVBUF:
+        print(
+            f"Warning: UDP receive buffer is {granted} bytes (wanted {LISTEN_RCVBUF}); "
+            f"bursts may be dropped. On Linux raise it with: sysctl -w net.core.rmem_max={LISTEN_RCVBUF}",
+            file=sys.stderr,
+        )
+
+def listen_logs(ports: List[int], workers: int = 1) -> None:
+    ports = list(dict.fromkeys(ports))
+    print(f"Listening for UDP logs on {', '.join(f'0.0.0.0:{p}' for p in ports)} (Ctrl+C to stop)")
+    _warn_if_rcvbuf_clamped()
+    # Ctrl+C ends the listener quietly instead of with a KeyboardInterrupt traceback.
+    previous = signal.signal(signal.SIGINT, lambda *_: sys.exit(0))
+    try:
+        if workers > 1:
+            _fork_listeners(ports, workers)
+        else:
+            _listen_loop(ports)
+    finally:
+        signal.signal(signal.SIGINT, previous)
+
+def _fork_listeners(ports: List[int], workers: int) -> None:
+    """Run ``workers`` forked listeners on the same ports and wait for them.
+
+    Ctrl+C reaches every process through the SIGINT handler installed by
+    listen_logs, which raises SystemExit(0): workers leave through the
+    SystemExit branch below, and the parent through the ``finally`` that
+    stops any worker still running.
+
+    Workers write to the shared stdout independently, so line order across
+    workers is not preserved, and a relay batch larger than PIPE_BUF may be
+    split mid-line when stdout is a pipe.
+    """
+    # Only Linux balances unicast datagrams across SO_REUSEPORT sockets; the
+    # BSDs and macOS hand them all to one socket, leaving the other workers idle.
+    if not sys.platform.startswith("linux") or not hasattr(os, "fork"):
+        raise SystemExit("--workers is only supported on Linux")
+    sys.stdout.flush()
+    sys.stderr.flush()
+    children: List[int] = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                _listen_loop(ports, reuse_port=True)
+            except SystemExit as e:
+                if isinstance(e.code, str):
+                    sys.stderr.write(f"{e.code}\n")
+                    code = 1
+                else:
+                    code = e.code or 0
+            finally:
+                with contextlib.suppress(Exception):
+                    sys.stdout.flush()
+                os._exit(code)
+        children.append(pid)
+
+    failed = False
+    try:
+        while children and not failed:
+            pid, status = os.wait()
+            children.remove(pid)
+            failed = os.waitstatus_to_exitcode(status) != 0
+    finally:
+        signal.signal(signal.SIGINT, signal.SIG_IGN)  # a second Ctrl+C must not orphan workers
+        for pid in children:
+            with contextlib.suppress(ProcessLookupError):
+                os.kill(pid, signal.SIGTERM)
+        for pid in children:
+            os.waitpid(pid, 0)
+    if failed:
+        raise SystemExit(1)
+
+def _listen_loop(ports: List[int], reuse_port: bool = False) -> None:
+    try:
+        with contextlib.ExitStack() as stack:
+            sel = stack.enter_context(selectors.DefaultSelector())
+            out_fd = _stdout_fd()
+            relays = out_fd is not None and _load_libc() is not None
+            for port in ports:
+                s = stack.enter_context(_open_log_socket(port, reuse_port))
+                mmsg = _RecvMmsg.for_socket(s)
+                if relays and mmsg is not None:
+                    sel.register(s, selectors.EVENT_READ, data=functools.partial(mmsg.relay, out_fd))
+                else:
+                    sel.register(s, selectors.EVENT_READ, data=(mmsg or _RecvFrom(s)).recv)
+
+            # Signals write a byte to this socketpair, so a blocked select() returns
+            # at once and the SIGINT handler runs promptly (including on Windows).
+            wake_r, wake_w = (stack.enter_context(x) for x in socket.socketpair())
+            wake_r.setblocking(False)
+            wake_w.setblocking(False)
+            previous_wakeup = signal.set_wakeup_fd(wake_w.fileno())
+            stack.callback(signal.set_wakeup_fd, previous_wakeup)
+            sel.register(wake_r, selectors.EVENT_READ, data=functools.partial(_drain_wakeup, wake_r))
+
+            # Log lines are already UTF-8 on the wire: hand the raw bytes to the
+            # binary buffer and let the terminal deal with any invalid sequences.
+            sys.stdout.flush()
+            if relays:
+                # Linux: recvmmsg buffers go straight to stdout, one writev per batch.
+                while True:
+                    for key, _ in sel.select():
+                        key.data()
+
+            out = sys.stdout.buffer
+            write, flush, monotonic = out.write, out.flush, time.monotonic
+            pending = 0
+            last_flush = monotonic()
             while True:
-                data, _ = s.recvfrom(65535)
-                txt = data.decode("utf-8", errors="replace")
-                sys.stdout.write(txt)
-                if not txt.endswith("\n"):
-                    sys.stdout.write("\n")
-                sys.stdout.flush()
+                # Only sleep once everything written so far has been flushed;
+                # otherwise poll, and flush as soon as nothing is left queued.
+                events = sel.select(timeout=0 if pending else None)
+                if events:
+                    for key, _ in events:
+                        packets = key.data()
+                        if packets:
+                            write(_join_lines(packets))
+                            pending += len(packets)
+                    now = monotonic()
+                    if pending < FLUSH_EVERY and now - last_flush < FLUSH_INTERVAL_S:
+                        continue
+                elif not pending:
+                    continue
+                flush()
+                pending = 0
+                last_flush = monotonic()
     except OSError as e:
-        raise SystemExit(f"Failed to create UDP socket for listening: {e}") from e
+        raise SystemExit(f"Failed to receive UDP logs: {e}") from e
 
 def main() -> None:
     ap = argparse.ArgumentParser(prog="esp32-udp-logger-cli")
+    ap.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"Always run mDNS discovery instead of reusing devices seen in the last {CACHE_TTL_S:.0f}s",
+    )
     sub = ap.add_subparsers(dest="cmd", required=True)
 
     sub.add_parser("list", help="List devices discovered via mDNS service _esp32udplog._udp")
@@ -155,15 +759,39 @@ def main() -> None:
         p.add_argument("device")
 
     p_listen = sub.add_parser("listen", help="Listen for UDP logs")
-    p_listen.add_argument("--port", type=int, default=DEFAULT_TX_PORT)
+    p_listen.add_argument(
+        "--port", type=int, nargs="+", default=[DEFAULT_TX_PORT], help="One or more UDP ports to listen on"
+    )
+    p_listen.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Listener processes sharing the ports via SO_REUSEPORT (Linux; unicast/bound mode only)",
+    )
 
     args = ap.parse_args()
 
     if args.cmd == "listen":
-        listen_logs(args.port)
+        if args.workers < 1:
+            ap.error("--workers must be at least 1")
+        listen_logs(args.port, workers=args.workers)
         return
 
-    devices = discover()
+    devices: Optional[List[Device]] = None
+    wanted = getattr(args, "device", None)
+    if wanted and wanted != "pick" and not args.no_cache:
+        cached = load_cached_devices()
+        if cached and wanted.lower() in {d.name.lower() for d in cached}:
+            devices = cached
+    if devices is None:
+        # list and the interactive picker need every device, so only a named
+        # target may end discovery early. Such a partial result is not cached,
+        # or it would hide the other devices from later commands.
+        if wanted and wanted != "pick":
+            devices = discover(target=wanted)
+        else:
+            devices = discover()
+            save_cached_devices(devices)
 
     if args.cmd == "list":
         if not devices:
@@ -173,67 +801,76 @@ def main() -> None:
             print(f"{d.name}\tip={d.ip}\trx_port={d.port}")
         return
 
+    by_name = {d.name: d for d in devices}
+    by_name_ci = {d.name.lower(): d for d in devices}
+
     def resolve(name: str) -> Device:
         if name == "pick":
             return pick_device(devices)
-        for d in devices:
-            if d.name == name:
-                return d
-        for d in devices:
-            if d.name.lower() == name.lower():
-                return d
-        raise SystemExit(f"Device not found: {name}. Run: {sys.argv[0]} list")
+        d = by_name.get(name) or by_name_ci.get(name.lower())
+        if d is None:
+            raise SystemExit(f"Device not found: {name}. Run: {sys.argv[0]} list")
+        return d
 
     if args.cmd == "pick":
         d = pick_device(devices)
         print(f"Selected {d.name} (ip={d.ip}, rx_port={d.port})")
-        print("Actions:")
-        print("  1) bind to me")
-        print("  2) status")
-        print("  3) unbind")
-        print("  4) broadcast off")
-        print("  5) broadcast on")
-        while True:
-            a = input("Choose [1-5]: ").strip()
-            if a in {"1","2","3","4","5"}:
-                break
-
-        if a == "1":
-            pc_ip = get_local_ip_for_target(d.ip)
-            r = send_udp_cmd(d.ip, d.port, f"bind {pc_ip} {args.tx_port}")
-            print(r or "OK (no reply)")
-        elif a == "2":
-            print(send_udp_cmd(d.ip, d.port, "status") or "(no reply)")
-        elif a == "3":
-            print(send_udp_cmd(d.ip, d.port, "unbind") or "OK (no reply)")
-        elif a == "4":
-            print(send_udp_cmd(d.ip, d.port, "broadcast off") or "OK (no reply)")
-        elif a == "5":
-            print(send_udp_cmd(d.ip, d.port, "broadcast on") or "OK (no reply)")
+        # choice -> (label, command, text shown when the device does not answer)
+        actions = {
+            "1": ("bind to me", "", "OK (no reply)"),
+            "2": ("status", "status", "(no reply)"),
+            "3": ("unbind", "unbind", "OK (no reply)"),
+            "4": ("broadcast off", "broadcast off", "OK (no reply)"),
+            "5": ("broadcast on", "broadcast on", "OK (no reply)"),
+        }
+        print("Actions (chain several with spaces, e.g. '3 1'):")
+        for key, (label, _, _) in actions.items():
+            print(f"  {key}) {label}")
+        print("  q) quit")
+        with open_cmd_socket(d.ip, d.port) as s:
+            while True:
+                try:
+                    a = input("Choose [1-5, q]: ").strip().lower()
+                except EOFError:
+                    break
+                if a == "q":
+                    break
+                picked = a.replace(",", " ").split()
+                if not picked or any(p not in actions for p in picked):
+                    continue
+
+                cmds = [
+                    actions[p][1] or f"bind {get_local_ip_for_target(d.ip)} {args.tx_port}" for p in picked
+                ]
+                if len(cmds) == 1:
+                    replies = [send_udp_cmd(d.ip, d.port, cmds[0], sock=s)]
+                else:
+                    replies = send_udp_cmds(d.ip, d.port, cmds, sock=s)
+                for p, r in zip(picked, replies):
+                    print(r or actions[p][2])
         return
 
     d = resolve(getattr(args, "device"))
 
     if args.cmd == "bind":
         pc_ip = args.pc_ip.strip() or get_local_ip_for_target(d.ip)
-        r = send_udp_cmd(d.ip, d.port, f"bind {pc_ip} {args.tx_port}")
-        print(r or "OK (no reply)")
+        print_reply(send_udp_cmd(d.ip, d.port, f"bind {pc_ip} {args.tx_port}", decode=False), "OK (no reply)")
         return
 
     if args.cmd == "unbind":
-        print(send_udp_cmd(d.ip, d.port, "unbind") or "OK (no reply)")
+        print_reply(send_udp_cmd(d.ip, d.port, "unbind", decode=False), "OK (no reply)")
         return
 
     if args.cmd == "status":
-        print(send_udp_cmd(d.ip, d.port, "status") or "(no reply)")
+        print_reply(send_udp_cmd(d.ip, d.port, "status", decode=False), "(no reply)")
         return
 
     if args.cmd == "broadcast-on":
-        print(send_udp_cmd(d.ip, d.port, "broadcast on") or "OK (no reply)")
+        print_reply(send_udp_cmd(d.ip, d.port, "broadcast on", decode=False), "OK (no reply)")
         return
 
     if args.cmd == "broadcast-off":
-        print(send_udp_cmd(d.ip, d.port, "broadcast off") or "OK (no reply)")
+        print_reply(send_udp_cmd(d.ip, d.port, "broadcast off", decode=False), "OK (no reply)")
         return
 
 if __name__ == "__main__":
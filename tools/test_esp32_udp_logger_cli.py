@@ -1,8 +1,16 @@
 import importlib.util
+import os
+import selectors
+import signal
+import socket
+import subprocess
 import sys
+import tempfile
+import threading
+import time
 import types
 from pathlib import Path
-from unittest import TestCase, mock
+from unittest import TestCase, mock, skipUnless
 
 
 def load_cli_module():
@@ -38,7 +46,7 @@ class ErrorHandlingTests(TestCase):
         network_error = OSError("network unreachable")
         mock_socket = mock.MagicMock()
         instance = mock_socket.return_value.__enter__.return_value
-        instance.sendto.side_effect = network_error
+        instance.send.side_effect = network_error
 
         with mock.patch("socket.socket", mock_socket):
             with self.assertRaises(SystemExit) as ctx:
@@ -49,14 +57,34 @@ class ErrorHandlingTests(TestCase):
     def test_listen_logs_bind_error_is_actionable(self):
         bind_error = OSError("address in use")
         mock_socket = mock.MagicMock()
-        instance = mock_socket.return_value.__enter__.return_value
+        instance = mock_socket.return_value
         instance.bind.side_effect = bind_error
 
-        with mock.patch("socket.socket", mock_socket):
+        with mock.patch("socket.socket", mock_socket), mock.patch.object(self.cli, "_warn_if_rcvbuf_clamped"):
             with self.assertRaises(SystemExit) as ctx:
-                self.cli.listen_logs(9000)
+                self.cli.listen_logs([9000])
 
         self.assertIn("Failed to bind UDP listener on port 9000", str(ctx.exception))
+        instance.close.assert_called_once_with()
+
+    def test_listen_logs_restores_sigint_handler(self):
+        before = signal.getsignal(signal.SIGINT)
+        mock_socket = mock.MagicMock()
+        mock_socket.return_value.bind.side_effect = OSError("address in use")
+
+        with mock.patch("socket.socket", mock_socket), mock.patch("builtins.print"):
+            with self.assertRaises(SystemExit):
+                self.cli.listen_logs([9000])
+
+        self.assertIs(signal.getsignal(signal.SIGINT), before)
+
+    def test_workers_are_refused_off_linux(self):
+        with mock.patch.object(self.cli.sys, "platform", "darwin"), mock.patch.object(self.cli.os, "fork") as fork:
+            with self.assertRaises(SystemExit) as ctx:
+                self.cli._fork_listeners([9000], 2)
+
+        self.assertEqual(str(ctx.exception), "--workers is only supported on Linux")
+        fork.assert_not_called()
 
     def test_get_local_ip_for_target_connect_error(self):
         connect_error = OSError("unreachable")
@@ -69,3 +97,580 @@ class ErrorHandlingTests(TestCase):
                 self.cli.get_local_ip_for_target("203.0.113.10")
 
         self.assertIn("Failed to determine local IP for 203.0.113.10", str(ctx.exception))
+
+
+class CommandSocketTests(TestCase):
+    def setUp(self):
+        self.cli = load_cli_module()
+
+    def test_send_udp_cmd_enlarges_reply_buffer(self):
+        mock_socket = mock.MagicMock()
+        instance = mock_socket.return_value.__enter__.return_value
+        instance.recv.return_value = b"ok"
+
+        with mock.patch("socket.socket", mock_socket):
+            self.assertEqual(self.cli.send_udp_cmd("10.0.0.1", 1234, "status"), "ok")
+
+        instance.setsockopt.assert_any_call(socket.SOL_SOCKET, socket.SO_RCVBUF, self.cli.REPLY_RCVBUF)
+        instance.connect.assert_called_once_with(("10.0.0.1", 1234))
+
+    def test_send_udp_cmd_reuses_given_socket(self):
+        sock = mock.Mock()
+        sock.recv.side_effect = [BlockingIOError, b"status: bound"]
+
+        with mock.patch("socket.socket") as mock_socket:
+            reply = self.cli.send_udp_cmd("10.0.0.1", 1234, "status", sock=sock)
+
+        self.assertEqual(reply, "status: bound")
+        sock.send.assert_called_once_with(b"status")
+        mock_socket.assert_not_called()
+
+    def test_send_udp_cmd_can_return_raw_bytes(self):
+        sock = mock.Mock()
+        sock.recv.side_effect = [BlockingIOError, b"OK bound\n"]
+
+        self.assertEqual(self.cli.send_udp_cmd("10.0.0.1", 1234, "bind", sock=sock, decode=False), b"OK bound\n")
+
+        sock.recv.side_effect = [BlockingIOError, socket.timeout]
+        self.assertEqual(self.cli.send_udp_cmd("10.0.0.1", 1234, "status", sock=sock, decode=False), b"")
+
+    def test_reused_socket_drops_late_reply_to_previous_command(self):
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as device:
+            device.bind(("127.0.0.1", 0))
+            device.settimeout(2)
+            ip, port = device.getsockname()
+
+            def answer():
+                data, peer = device.recvfrom(2048)
+                time.sleep(0.3)  # misses the client's 0.2 s timeout
+                device.sendto(b"REPLY TO " + data + b"\n", peer)
+                data, peer = device.recvfrom(2048)
+                device.sendto(b"REPLY TO " + data + b"\n", peer)
+
+            responder = threading.Thread(target=answer)
+            responder.start()
+            with self.cli.open_cmd_socket(ip, port, reply_timeout_s=0.2) as s:
+                first = self.cli.send_udp_cmd(ip, port, "status", sock=s)
+                time.sleep(0.3)  # the late reply is now queued
+                second = self.cli.send_udp_cmd(ip, port, "unbind", sock=s)
+            responder.join()
+
+        self.assertEqual(first, "")
+        self.assertEqual(second, "REPLY TO unbind\n")
+
+    def test_closed_port_reads_as_no_reply(self):
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as probe:
+            probe.bind(("127.0.0.1", 0))
+            ip, port = probe.getsockname()
+
+        self.assertEqual(self.cli.send_udp_cmd(ip, port, "status", reply_timeout_s=0.3), "")
+        with self.cli.open_cmd_socket(ip, port, reply_timeout_s=0.3) as s:
+            self.assertEqual(self.cli.send_udp_cmd(ip, port, "status", sock=s), "")
+            self.assertEqual(self.cli.send_udp_cmd(ip, port, "unbind", sock=s), "")
+            self.assertEqual(self.cli.send_udp_cmds(ip, port, ["status", "unbind"], sock=s), ["", ""])
+
+
+class LocalIpTests(TestCase):
+    def setUp(self):
+        self.cli = load_cli_module()
+
+    def test_local_ip_is_memoized_per_subnet(self):
+        mock_socket = mock.MagicMock()
+        instance = mock_socket.return_value.__enter__.return_value
+        instance.getsockname.return_value = ("192.168.1.20", 50000)
+
+        with mock.patch("socket.socket", mock_socket):
+            self.assertEqual(self.cli.get_local_ip_for_target("192.168.1.5"), "192.168.1.20")
+            self.assertEqual(self.cli.get_local_ip_for_target("192.168.1.77"), "192.168.1.20")
+
+        instance.connect.assert_called_once_with(("192.168.1.5", 9))
+
+
+class ListenerSocketTests(TestCase):
+    def setUp(self):
+        self.cli = load_cli_module()
+
+    def test_set_rcvbuf_survives_kernel_refusal(self):
+        sock = mock.Mock()
+        sock.setsockopt.side_effect = OSError("no buffer space")
+        sock.getsockopt.return_value = 212992
+
+        self.assertEqual(self.cli._set_rcvbuf(sock, self.cli.LISTEN_RCVBUF), 212992)
+
+    def _rcvbuf_warnings(self, readback, platform):
+        mock_socket = mock.MagicMock()
+        mock_socket.return_value.__enter__.return_value.getsockopt.return_value = readback
+
+        with mock.patch("socket.socket", mock_socket), mock.patch("builtins.print") as fake_print, mock.patch.object(
+            self.cli.sys, "platform", platform
+        ):
+            self.cli._warn_if_rcvbuf_clamped()
+
+        return [c[0][0] for c in fake_print.call_args_list]
+
+    def test_clamped_rcvbuf_warning_is_printed_once(self):
+        warnings = self._rcvbuf_warnings(212992, "darwin")
+
+        self.assertEqual(len(warnings), 1)
+        self.assertIn("Warning: UDP receive buffer is 212992 bytes", warnings[0])
+
+    def test_linux_rcvbuf_readback_is_halved(self):
+        # rmem_max=4194304: Linux reports 8388608, which is still below 2 * LISTEN_RCVBUF.
+        warnings = self._rcvbuf_warnings(8_388_608, "linux")
+
+        self.assertEqual(len(warnings), 1)
+        self.assertIn("Warning: UDP receive buffer is 4194304 bytes", warnings[0])
+
+        # rmem_max=8388608: the readback (16777216) exceeds LISTEN_RCVBUF but is still clamped.
+        warnings = self._rcvbuf_warnings(16_777_216, "linux")
+        self.assertEqual(len(warnings), 1)
+        self.assertIn("Warning: UDP receive buffer is 8388608 bytes", warnings[0])
+
+        self.assertEqual(self._rcvbuf_warnings(2 * self.cli.LISTEN_RCVBUF, "linux"), [])
+
+    def test_second_plain_listener_on_same_port_fails_to_bind(self):
+        with self.cli._open_log_socket(0) as first:
+            port = first.getsockname()[1]
+            with self.assertRaises(SystemExit) as ctx:
+                self.cli._open_log_socket(port)
+
+        self.assertIn(f"Failed to bind UDP listener on port {port}", str(ctx.exception))
+
+    @skipUnless(hasattr(socket, "SO_REUSEPORT"), "needs SO_REUSEPORT")
+    def test_worker_listeners_share_the_port(self):
+        with self.cli._open_log_socket(0, reuse_port=True) as first:
+            port = first.getsockname()[1]
+            with self.cli._open_log_socket(port, reuse_port=True) as second:
+                self.assertEqual(second.getsockname()[1], port)
+
+
+class ReceiveBatchTests(TestCase):
+    def setUp(self):
+        self.cli = load_cli_module()
+
+    @skipUnless(sys.platform.startswith("linux"), "recvmmsg is Linux-only")
+    def test_recvmmsg_returns_queued_datagrams_in_one_call(self):
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as rx, socket.socket(
+            socket.AF_INET, socket.SOCK_DGRAM
+        ) as tx:
+            rx.bind(("127.0.0.1", 0))
+            rx.setblocking(False)
+            for line in (b"one\n", b"two", b"three\n"):
+                tx.sendto(line, rx.getsockname())
+
+            batch = self.cli._RecvMmsg.for_socket(rx)
+            self.assertIsNotNone(batch)
+            self.assertEqual(batch.recv(), [b"one\n", b"two", b"three\n"])
+
+    @skipUnless(sys.platform.startswith("linux"), "recvmmsg is Linux-only")
+    def test_recvmmsg_relay_writes_batch_to_fd(self):
+        read_fd, write_fd = os.pipe()
+        self.addCleanup(os.close, read_fd)
+        self.addCleanup(os.close, write_fd)
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as rx, socket.socket(
+            socket.AF_INET, socket.SOCK_DGRAM
+        ) as tx:
+            rx.bind(("127.0.0.1", 0))
+            rx.setblocking(False)
+            for line in (b"one\n", b"", b"two"):
+                tx.sendto(line, rx.getsockname())
+
+            relay = self.cli._RecvMmsg.for_socket(rx).relay
+            self.assertEqual(relay(write_fd), 3)
+            self.assertEqual(relay(write_fd), 0)
+
+        self.assertEqual(os.read(read_fd, 1024), b"one\n\ntwo\n")
+
+    def test_portable_receiver_drains_without_blocking(self):
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as rx, socket.socket(
+            socket.AF_INET, socket.SOCK_DGRAM
+        ) as tx:
+            rx.bind(("127.0.0.1", 0))
+            rx.setblocking(False)
+            for line in (b"a much longer first line\n", b"b"):
+                tx.sendto(line, rx.getsockname())
+            time.sleep(0.05)
+
+            recv = self.cli._RecvFrom(rx).recv
+            self.assertEqual(recv(), [b"a much longer first line\n", b"b"])
+            self.assertEqual(recv(), [])
+
+    def test_join_lines_terminates_each_datagram_once(self):
+        packets = [b"one\n", b"two", "dréi".encode("utf-8"), b"\xffbad\n"]
+
+        self.assertEqual(self.cli._join_lines(packets), b"one\ntwo\ndr\xc3\xa9i\n\xffbad\n")
+
+
+class _StopLoop(Exception):
+    pass
+
+
+class ListenLoopTests(TestCase):
+    def setUp(self):
+        self.cli = load_cli_module()
+
+    def _run_loop(self, lines):
+        """Run the portable listen loop on an ephemeral port until it would block while idle."""
+        timeouts = []
+
+        class ScriptedSelector(selectors.DefaultSelector):
+            def select(self, timeout=None):
+                timeouts.append(timeout)
+                if len(timeouts) == 1:
+                    for key in self.get_map().values():
+                        if key.fileobj.family == socket.AF_INET:
+                            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as tx:
+                                for line in lines:
+                                    tx.sendto(line, ("127.0.0.1", key.fileobj.getsockname()[1]))
+                elif timeout is None:
+                    raise _StopLoop
+                return super().select(timeout)
+
+        stdout = mock.Mock()
+        with mock.patch.object(self.cli, "_load_libc", return_value=None), mock.patch.object(
+            self.cli.selectors, "DefaultSelector", ScriptedSelector
+        ), mock.patch.object(self.cli.sys, "stdout", stdout):
+            with self.assertRaises(_StopLoop):
+                self.cli._listen_loop([0])
+        return stdout.buffer, timeouts
+
+    def test_burst_is_flushed_once_drained_then_loop_sleeps(self):
+        out, timeouts = self._run_loop([b"one\n", b"two", b"three"])
+
+        self.assertEqual(
+            out.method_calls,
+            [mock.call.write(b"one\ntwo\nthree\n"), mock.call.flush()],
+        )
+        # block, poll once (nothing left -> flush), then block again instead of spinning
+        self.assertEqual(timeouts, [None, 0, None])
+
+    def test_large_burst_flushes_at_flush_every(self):
+        lines = [b"line %d" % i for i in range(self.cli.FLUSH_EVERY + 8)]
+
+        out, timeouts = self._run_loop(lines)
+
+        self.assertEqual(out.method_calls, [mock.call.write(self.cli._join_lines(lines)), mock.call.flush()])
+        # flushed without a poll round since the batch already reached FLUSH_EVERY
+        self.assertEqual(timeouts, [None, None])
+
+
+_LISTENER_DRIVER = """
+import signal, sys
+sys.path.insert(0, sys.argv[1])
+from test_esp32_udp_logger_cli import load_cli_module
+cli = load_cli_module()
+if sys.argv[2] == "portable":
+    cli._load_libc = lambda: None
+sys.argv = ["esp32-udp-logger-cli", "listen", *sys.argv[3:]]
+try:
+    cli.main()
+finally:
+    sys.stderr.write("wakeup_fd=%d\\n" % signal.set_wakeup_fd(-1))
+"""
+
+
+def _free_udp_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class ListenerProcessTests(TestCase):
+    """Run the real listener in a child process and talk to it over loopback."""
+
+    def _start(self, mode, *args):
+        proc = subprocess.Popen(
+            [sys.executable, "-c", _LISTENER_DRIVER, str(Path(__file__).resolve().parent), mode, *args],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            start_new_session=True,
+        )
+        self.addCleanup(proc.stderr.close)
+        self.addCleanup(proc.stdout.close)
+        self.addCleanup(proc.wait)
+        self.addCleanup(lambda: proc.poll() is None and proc.kill())
+        lines = []
+        reader = threading.Thread(target=lambda: lines.extend(proc.stdout), daemon=True)
+        reader.start()
+        return proc, lines, reader
+
+    def _await_lines(self, lines, ports, timeout_s=10.0):
+        """Resend one line per port until each shows up (the sockets bind after the banner)."""
+        expected = {b"hello from %d\n" % p for p in ports}
+        deadline = time.monotonic() + timeout_s
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as tx:
+            while not expected <= set(lines) and time.monotonic() < deadline:
+                for p in ports:
+                    tx.sendto(b"hello from %d" % p, ("127.0.0.1", p))
+                time.sleep(0.05)
+        return expected
+
+    def _interrupt(self, proc, reader):
+        os.killpg(proc.pid, signal.SIGINT)
+        try:
+            code = proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.fail("listener did not stop on SIGINT")
+        reader.join(timeout=5)
+        return code, proc.stderr.read().decode()
+
+    def _check_two_ports(self, mode):
+        ports = [_free_udp_port(), _free_udp_port()]
+        proc, lines, reader = self._start(mode, "--port", *map(str, ports))
+
+        expected = self._await_lines(lines, ports)
+        self._interrupt(proc, reader)
+
+        self.assertTrue(lines and lines[0].startswith(b"Listening for UDP logs on"), lines[:1])
+        self.assertLessEqual(expected, set(lines))
+
+    @skipUnless(sys.platform.startswith("linux"), "recvmmsg/writev relay is Linux-only")
+    def test_listen_relays_two_ports_to_stdout(self):
+        self._check_two_ports("native")
+
+    def test_listen_portable_path_prints_two_ports(self):
+        self._check_two_ports("portable")
+
+    def _check_sigint_exits_cleanly(self, *args):
+        port = _free_udp_port()
+        proc, lines, reader = self._start("native", "--port", str(port), *args)
+        self._await_lines(lines, [port])
+
+        code, err = self._interrupt(proc, reader)
+
+        self.assertEqual(code, 0, err)
+        self.assertNotIn("Traceback", err)
+        self.assertIn("wakeup_fd=-1", err)  # the listener restored the original wakeup fd
+
+    def test_sigint_stops_listener_cleanly(self):
+        self._check_sigint_exits_cleanly()
+
+    @skipUnless(sys.platform.startswith("linux"), "--workers is Linux-only")
+    def test_sigint_stops_forked_workers_cleanly(self):
+        self._check_sigint_exits_cleanly("--workers", "2")
+
+
+class DeviceCacheTests(TestCase):
+    def setUp(self):
+        self.cli = load_cli_module()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        patcher = mock.patch.dict(os.environ, {"XDG_CACHE_HOME": tmp.name})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_cache_round_trip(self):
+        devices = [self.cli.Device(name="esp32-udp-logger-7A3F", host="esp32.local", ip="10.0.0.5", port=9998)]
+        self.cli.save_cached_devices(devices)
+
+        self.assertEqual(self.cli.load_cached_devices(), devices)
+
+    def test_stale_or_missing_cache_is_ignored(self):
+        self.assertIsNone(self.cli.load_cached_devices())
+
+        self.cli.save_cached_devices([])
+        self.assertIsNone(self.cli.load_cached_devices(max_age_s=-1))
+
+    def _main(self, *argv, found=()):
+        with mock.patch.object(sys, "argv", ["esp32-udp-logger-cli", *argv]), mock.patch.object(
+            self.cli, "discover", return_value=list(found)
+        ) as discover, mock.patch.object(self.cli, "send_udp_cmd", return_value=b"ok") as send, mock.patch.object(
+            self.cli, "print_reply"
+        ):
+            self.cli.main()
+        return discover, send
+
+    def test_main_uses_cache_hit_for_named_device(self):
+        dev = self.cli.Device(name="esp32-udp-logger-7A3F", host="esp32.local", ip="10.0.0.5", port=9998)
+        self.cli.save_cached_devices([dev])
+
+        discover, send = self._main("status", "ESP32-UDP-LOGGER-7a3f")
+
+        discover.assert_not_called()
+        send.assert_called_once_with("10.0.0.5", 9998, "status", decode=False)
+
+    def test_main_no_cache_forces_discovery(self):
+        dev = self.cli.Device(name="esp32-udp-logger-7A3F", host="esp32.local", ip="10.0.0.5", port=9998)
+        self.cli.save_cached_devices([dev])
+        moved = self.cli.Device(name=dev.name, host=dev.host, ip="10.0.0.9", port=9998)
+
+        discover, send = self._main("--no-cache", "status", dev.name, found=[moved])
+
+        discover.assert_called_once_with(target=dev.name)
+        send.assert_called_once_with("10.0.0.9", 9998, "status", decode=False)
+
+    def test_main_caches_only_full_discovery(self):
+        devices = [
+            self.cli.Device(name="esp32-udp-logger-7A3F", host="a.local", ip="10.0.0.5", port=9998),
+            self.cli.Device(name="esp32-udp-logger-1B2C", host="b.local", ip="10.0.0.6", port=9998),
+        ]
+        with mock.patch("builtins.print"):
+            self._main("list", found=devices)
+        self.assertEqual(self.cli.load_cached_devices(), devices)
+
+        # an early-exit lookup of an uncached name must not shrink the cache
+        other = self.cli.Device(name="esp32-udp-logger-9999", host="c.local", ip="10.0.0.7", port=9998)
+        discover, _ = self._main("status", other.name, found=[other])
+
+        discover.assert_called_once_with(target=other.name)
+        self.assertEqual(self.cli.load_cached_devices(), devices)
+
+
+class DiscoveryTests(TestCase):
+    def setUp(self):
+        self.cli = load_cli_module()
+
+    def _service_info(self, ip):
+        return types.SimpleNamespace(port=9998, server="esp32.local.", parsed_addresses=lambda: [ip])
+
+    def test_listener_signals_when_target_is_seen(self):
+        listener = self.cli._Listener(target_name="ESP32-UDP-LOGGER-7A3F")
+        zc = mock.Mock()
+        zc.get_service_info.return_value = self._service_info("10.0.0.4")
+
+        listener.add_service(zc, self.cli.SERVICE_TYPE, "esp32-udp-logger-0001._esp32udplog._udp.local.")
+        self.assertFalse(listener.found.is_set())
+
+        listener.add_service(zc, self.cli.SERVICE_TYPE, "esp32-udp-logger-7A3F._esp32udplog._udp.local.")
+        self.assertTrue(listener.found.is_set())
+
+    def test_listener_without_target_waits_for_full_timeout(self):
+        listener = self.cli._Listener()
+        zc = mock.Mock()
+        zc.get_service_info.return_value = self._service_info("10.0.0.4")
+
+        listener.add_service(zc, self.cli.SERVICE_TYPE, "esp32-udp-logger-0001._esp32udplog._udp.local.")
+
+        self.assertFalse(listener.found.is_set())
+        self.assertIn("esp32-udp-logger-0001", listener.devices)
+
+    def test_discover_reuses_one_zeroconf_browser(self):
+        with mock.patch.object(self.cli, "Zeroconf") as zc_cls, mock.patch.object(
+            self.cli, "ServiceBrowser"
+        ) as browser_cls, mock.patch.object(self.cli.atexit, "register"), mock.patch.object(self.cli.time, "sleep"):
+            self.cli.discover(timeout_s=0)
+            self.cli.discover(timeout_s=0, target="esp32-udp-logger-7A3F")
+
+        zc_cls.assert_called_once_with()
+        browser_cls.assert_called_once()
+
+    def test_info_to_device_prefers_ipv4(self):
+        info = types.SimpleNamespace(
+            port=9998, server="esp32.local.", parsed_addresses=lambda: ["fe80::1", "10.0.0.9", "10.0.0.10"]
+        )
+
+        dev = self.cli._info_to_device(info, "esp32-udp-logger-7A3F._esp32udplog._udp.local.")
+
+        self.assertEqual(dev.ip, "10.0.0.9")
+        self.assertEqual(dev.host, "esp32.local")
+
+    def test_info_to_device_skips_ipv6_only(self):
+        info = types.SimpleNamespace(port=9998, server="esp32.local.", parsed_addresses=lambda: ["fe80::1"])
+
+        self.assertIsNone(self.cli._info_to_device(info, "esp32-udp-logger-7A3F._esp32udplog._udp.local."))
+
+
+class PickerTests(TestCase):
+    def setUp(self):
+        self.cli = load_cli_module()
+        self.devices = [
+            self.cli.Device(name=name, host=name + ".local", ip="10.0.0.1", port=9998)
+            for name in ("esp32-udp-logger-7A3F", "esp32-udp-logger-7A3F0", "esp32-udp-logger-B001")
+        ]
+
+    def test_match_device_by_index_name_and_prefix(self):
+        match = self.cli.match_device
+        self.assertIs(match(self.devices, "3"), self.devices[2])
+        self.assertIs(match(self.devices, "ESP32-UDP-LOGGER-7A3F"), self.devices[0])
+        self.assertIs(match(self.devices, "esp32-udp-logger-b"), self.devices[2])
+
+    def test_match_device_rejects_ambiguous_or_out_of_range(self):
+        match = self.cli.match_device
+        self.assertIsNone(match(self.devices, "esp32-udp-logger-7"))
+        self.assertIsNone(match(self.devices, "0"))
+        self.assertIsNone(match(self.devices, ""))
+
+    def test_pick_device_reads_once(self):
+        with mock.patch("builtins.input", side_effect=["nope", "1"]) as fake_input, mock.patch("builtins.print"):
+            with self.assertRaises(SystemExit):
+                self.cli.pick_device(self.devices)
+
+        fake_input.assert_called_once()
+
+    def test_pick_device_binds_tab_for_libedit_and_restores_readline(self):
+        fake_readline = mock.Mock(__doc__="Importing this module enables command line editing using libedit readline.")
+        fake_readline.get_completer.return_value = None
+        fake_readline.get_completer_delims.return_value = " -\t\n"
+
+        with mock.patch.object(self.cli, "readline", fake_readline), mock.patch(
+            "builtins.input", return_value="2"
+        ), mock.patch("builtins.print"):
+            self.assertIs(self.cli.pick_device(self.devices), self.devices[1])
+
+        fake_readline.parse_and_bind.assert_called_once_with("bind ^I rl_complete")
+        self.assertEqual(fake_readline.set_completer_delims.call_args_list[-1], mock.call(" -\t\n"))
+        self.assertEqual(fake_readline.set_completer.call_args_list[-1], mock.call(None))
+
+    def test_pick_device_takes_names_only_when_list_is_hidden(self):
+        many = [
+            self.cli.Device(name=f"esp32-udp-logger-{i:04X}", host="h.local", ip="10.0.0.1", port=9998)
+            for i in range(self.cli.PICK_LIST_MAX + 1)
+        ]
+
+        with mock.patch("builtins.input", return_value="esp32-udp-logger-0003") as fake_input, mock.patch(
+            "builtins.print"
+        ):
+            self.assertIs(self.cli.pick_device(many), many[3])
+        fake_input.assert_called_once_with("Select device [name]: ")
+
+        with mock.patch("builtins.input", return_value="3"), mock.patch("builtins.print"):
+            with self.assertRaises(SystemExit) as ctx:
+                self.cli.pick_device(many)
+        self.assertIn("use a unique name prefix", str(ctx.exception))
+
+
+class BatchCommandTests(TestCase):
+    def setUp(self):
+        self.cli = load_cli_module()
+
+    def test_send_udp_cmds_collects_one_reply_per_command(self):
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as device:
+            device.bind(("127.0.0.1", 0))
+            device.settimeout(2)
+            ip, port = device.getsockname()
+
+            def answer():
+                for _ in range(2):
+                    data, peer = device.recvfrom(2048)
+                    device.sendto(b"OK " + data + b"\n", peer)
+
+            responder = threading.Thread(target=answer)
+            responder.start()
+            replies = self.cli.send_udp_cmds(ip, port, ["unbind", "status", "broadcast on"], reply_timeout_s=0.3)
+            responder.join()
+
+        self.assertEqual(replies, ["OK unbind\n", "OK status\n", ""])
+
+    def test_send_udp_cmds_ignores_late_reply_from_earlier_action(self):
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as device:
+            device.bind(("127.0.0.1", 0))
+            device.settimeout(2)
+            ip, port = device.getsockname()
+
+            def answer():
+                data, peer = device.recvfrom(2048)
+                time.sleep(0.3)  # misses the client's 0.2 s timeout
+                device.sendto(b"REPLY TO " + data + b"\n", peer)
+                for _ in range(2):
+                    data, peer = device.recvfrom(2048)
+                    device.sendto(b"REPLY TO " + data + b"\n", peer)
+
+            responder = threading.Thread(target=answer)
+            responder.start()
+            with self.cli.open_cmd_socket(ip, port, reply_timeout_s=0.2) as s:
+                self.assertEqual(self.cli.send_udp_cmd(ip, port, "status", sock=s), "")
+                time.sleep(0.3)  # the late reply is now queued
+                replies = self.cli.send_udp_cmds(ip, port, ["unbind", "broadcast on"], reply_timeout_s=0.5, sock=s)
+            responder.join()
+
+        self.assertEqual(replies, ["REPLY TO unbind\n", "REPLY TO broadcast on\n"])